@@ -1,17 +1,25 @@
+import copy
+import os
+import socket
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import schedule
 import argparse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 
-from utils import MainCategory
+from utils import BrowserPool, MainCategory
 
 categories = {
     'batter-props':['home-runs', 'hits', 'total-bases', 'rbis', 'runs-scored', 'hits-+-runs-+-rbis', 'stolen-bases', 'strikeouts', 'singles', 'doubles', 'walks'],
     'pitcher-props':['strikeouts-thrown', 'outs-recorded', 'hits-allowed', 'earned-runs-allowed', 'walks-allowed']
 }
 
+# Upper bound on the Chrome instances running at once, shared by all main categories
+max_browsers = 6
+
 options = Options()
 options.add_argument("--silent")
 options.add_argument("--headless")
@@ -20,25 +28,73 @@ options.add_argument("--mute-audio")
 options.add_argument("--allow-running-insecure-content")
 options.add_argument("--disable-gpu")
 options.add_argument("--disable-logging")
+options.add_argument("--disable-extensions")
+options.add_argument("--disable-background-networking")
+options.add_argument("--disable-default-apps")
+options.add_argument("--blink-settings=imagesEnabled=false")
 user_agent = 'Moilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebkit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
 options.add_argument(f"user-agent={user_agent}")
 
 
-def initialize_driver():
-    return webdriver.Chrome(options=options)
+def clear_stale_profile_lock(profile_dir: str):
+    # Chrome marks a profile in use with a SingletonLock symlink to "<hostname>-<pid>" (Linux/macOS).
+    # A Chrome that was killed leaves it behind and every later start on the profile fails.
+    # On Windows the lock is an open file handle, which is released when the process exits.
+    try:
+        owner = os.readlink(os.path.join(profile_dir, "SingletonLock"))
+    except OSError:
+        return
+    hostname, _, pid = owner.rpartition("-")
+    if hostname != socket.gethostname() or not pid.isdigit():
+        return # Owned by another host sharing the directory, whose processes can't be checked from here
+    try:
+        os.kill(int(pid), 0)
+        return # The owning Chrome is still running
+    except ProcessLookupError:
+        pass
+    except OSError:
+        return
+    for lock_file in ("SingletonLock", "SingletonSocket", "SingletonCookie"):
+        try:
+            os.remove(os.path.join(profile_dir, lock_file))
+        except FileNotFoundError:
+            pass
+
+
+def initialize_driver(profile: str):
+    # A persistent profile per pool slot lets Chrome reuse its warm profile between runs
+    driver_options = copy.deepcopy(options)
+    profile_dir = os.path.join(tempfile.gettempdir(), f"mlb-odds-profile-{profile}")
+    clear_stale_profile_lock(profile_dir)
+    driver_options.add_argument(f"--user-data-dir={profile_dir}")
+    return webdriver.Chrome(options=driver_options)
 
 
 def get_odds(multithread: bool):
-    batter_props = MainCategory('batter-props', categories['batter-props'])
-    pitcher_props = MainCategory('pitcher-props', categories['pitcher-props'])
-
-    print("Gathering data for the main category: batter props...")
-    batter_props.gather_odds(initialize_driver, multithread)
-    print("Done with batter props")
-    
-    print("Gathering data for the main category: pitcher props..." )
-    pitcher_props.gather_odds(initialize_driver, multithread)
-    print("Done with pitcher props")
+    batter_props = MainCategory('batter-props', categories['batter-props'], multithread)
+    pitcher_props = MainCategory('pitcher-props', categories['pitcher-props'], multithread)
+
+    pool = BrowserPool(initialize_driver, max_browsers if multithread else 1, 'pool')
+    try:
+        if multithread:
+            print("Gathering data for the main categories: batter props and pitcher props...")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                batter_future = executor.submit(batter_props.gather_odds, pool)
+                pitcher_future = executor.submit(pitcher_props.gather_odds, pool)
+                batter_future.result()
+                print("Done with batter props")
+                pitcher_future.result()
+                print("Done with pitcher props")
+        else:
+            print("Gathering data for the main category: batter props...")
+            batter_props.gather_odds(pool)
+            print("Done with batter props")
+
+            print("Gathering data for the main category: pitcher props...")
+            pitcher_props.gather_odds(pool)
+            print("Done with pitcher props")
+    finally:
+        pool.close()
 
     df = batter_props + pitcher_props
     print(df)
@@ -52,15 +108,19 @@ def main(args):
     schedule.every(args.gather_freq).minutes.do(get_odds, args.multithread)
 
     while True:
+        idle_seconds = schedule.idle_seconds() # Sleep until the next gather is due
+        if idle_seconds is None:
+            break
+        if idle_seconds > 0:
+            time.sleep(idle_seconds)
         schedule.run_pending()
-        time.sleep(60)
 
 
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument('-m', '--multithread', action='store_false', help='Enable multithreading')
+    parser.add_argument('--multithread', action=argparse.BooleanOptionalAction, default=True, help='Gather subcategories with multiple threads')
     parser.add_argument('-s', '--save-to-csv', action='store_true', help='Store the table to a csv file')
     parser.add_argument('--gather-freq', type=int, default=20, help='The frequency in minutes to gather odds')
     args = parser.parse_args()
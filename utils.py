@@ -1,16 +1,40 @@
 import datetime
+import functools
+import hashlib
+import queue
 import re
 import urllib
-import unicodedata
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pandas as pd
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 
 
+_ODDS_RE = re.compile(r'^([OU])\s(\d+\.\d+)([+-]\d+)$')
+_TEAM_RE = re.compile(r'[a-z][A-Z]')
+# Minus signs and non-breaking spaces used in the odds cells
+_NORM_TABLE = str.maketrans({'\u2212': '-', '\u00a0': ' '})
 
-@dataclass
+# Repeating string columns stored as categoricals in the final table
+_CATEGORICAL_COLUMNS = ['main_category_type', 'sub_category_type', 'odd_type', 'home_team', 'away_team']
+
+# Serializes only the event wrappers in the browser instead of the whole page source
+_EVENTS_HTML_SCRIPT = (
+    "return '<div>' + Array.from(document.querySelectorAll('div.sportsbook-event-accordion__wrapper'), "
+    "event => event.outerHTML).join('') + '</div>';"
+)
+
+# Last page hash and odds gathered for each subcategory url
+_page_cache: dict[str, tuple[bytes, pd.DataFrame]] = {}
+
+
+@dataclass(frozen=True)
 class EventInfo:
     """
     Represents information about an event.
@@ -18,67 +42,150 @@ class EventInfo:
     home_team: str
     away_team: str
     game_time: str
+    game_date: str
+    game_time_local: str
+    game_time_utc: str
+
 
-    def __post_init__(self):
+@dataclass(frozen=True)
+class _EmptySlot:
+    """
+    Placeholder for a pool slot whose driver could not be restarted.
+    """
+    profile: str
+
+
+class BrowserPool:
+    """
+    A bounded pool of web drivers shared between subcategories.
+    """
+    def __init__(self, driver_initializer, size: int, name: str, acquire_timeout: float = 300):
+        self.size = size
+        self._driver_initializer = driver_initializer
+        self._acquire_timeout = acquire_timeout
+        self._profiles = {}
+        self._drivers = queue.Queue(maxsize=size)
+        try:
+            for slot in range(size):
+                self._drivers.put(self._start_driver(f"{name}-{slot}"))
+        except Exception:
+            # Don't leave the browsers started so far running
+            self.close()
+            raise
+
+    def _start_driver(self, profile: str):
         """
-        Post-initialization method to split the game time into local and UTC times, and set the game date.
+        Start a driver for a pool slot and remember which profile it uses.
         """
-        self.split_game_time()
+        driver = self._driver_initializer(profile)
+        self._profiles[driver] = profile
+        return driver
 
-    def split_game_time(self):
+    def _restart_driver(self, driver):
         """
-        Split the game time into local and UTC times, and set the game date.
+        Quit a driver whose browser session died and start a new one for the same slot.
+        Returns an empty slot marker if the new driver cannot be started.
         """
-        day, time_str = self.game_time.split(' ')
-        if day == 'Tomorrow':
-            self.game_date = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime('%Y-%m-%d')
-        else:
-            self.game_date = datetime.datetime.now().strftime('%Y-%m-%d')
-        full_time_str = f'{self.game_date} {time_str}'
-        time_obj = datetime.datetime.strptime(full_time_str, '%Y-%m-%d %I:%M%p')
-        self.game_time_local = time_obj.strftime("%H:%M")
-        self.game_time_utc = time_obj.astimezone(datetime.timezone.utc).strftime("%H:%M")
-        
-        
+        profile = self._profiles.pop(driver)
+        _quit_driver(driver)
+        try:
+            return self._start_driver(profile)
+        except Exception:
+            return _EmptySlot(profile)
+
+    def acquire(self):
+        """
+        Take a driver from the pool, blocking until one is available.
+
+        Raises:
+        - TimeoutError: If no driver is returned to the pool within the acquire timeout.
+        """
+        try:
+            driver = self._drivers.get(timeout=self._acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No web driver became available within {self._acquire_timeout} seconds") from None
+        if isinstance(driver, _EmptySlot):
+            try:
+                return self._start_driver(driver.profile)
+            except Exception:
+                self._drivers.put(driver) # Retry the slot on the next acquire
+                raise
+        return driver
+
+    def release(self, driver) -> None:
+        """
+        Clear the driver's cookies and return it to the pool, replacing it if its browser session died.
+        Never raises, so it is safe to call while another error is propagating.
+        """
+        try:
+            driver.delete_all_cookies()
+        except Exception:
+            # The browser or chromedriver is gone; Selenium may raise its own or urllib3's errors
+            driver = self._restart_driver(driver)
+        self._drivers.put(driver)
+
+    def close(self) -> None:
+        """
+        Quit every driver in the pool. Never raises.
+        """
+        while not self._drivers.empty():
+            driver = self._drivers.get()
+            if isinstance(driver, _EmptySlot):
+                continue
+            self._profiles.pop(driver, None)
+            _quit_driver(driver)
 
 
 class MainCategory:
-    def __init__(self, category: str, subcategories: list[str]):
+    def __init__(self, category: str, subcategories: list[str], multithread: bool = True):
         self.main_category = category
         self.subcategories = subcategories
+        self._gather_impl = self._gather_threaded if multithread else self._gather_serial
 
 
-    def gather_odds(self, driver_initializer, multithread: bool) -> pd.DataFrame:
+    def gather_odds(self, pool: BrowserPool) -> pd.DataFrame:
         """
         Gather odds data for all subcategories within the main category.
 
         Parameters:
-        - driver_initializer: The driver initializer function used to initialize the Selenium web driver.
+        - pool (BrowserPool): The pool of Selenium web drivers to load the subcategory pages with.
 
         Returns:
         - pd.DataFrame: A DataFrame containing the gathered odds data for all subcategories.
         """
-        tables = []
-        def gather_odds_for_subcategory(category):
-            subcategory = SubCategory(self.main_category, category, driver_initializer)
-            return subcategory.get_subcategory_odds()
-
-        if multithread:
-            with ThreadPoolExecutor() as executor:
-                # Submit tasks for each subcategory
-                futures = [executor.submit(gather_odds_for_subcategory, category) for category in self.subcategories]
-
-                # Gather results as they become available
-                for future in futures:
-                    table = future.result()
-                    tables.append(table)
-        else:
-            tables = [gather_odds_for_subcategory(category) for category in self.subcategories]
-        category_table = pd.concat(tables)
-        category_table.reset_index(drop=True, inplace=True)
+        tables = self._gather_impl(pool)
+        category_table = pd.concat(tables, ignore_index=True)
         self.df = category_table
         return category_table
 
+    def _gather_threaded(self, pool: BrowserPool) -> list[pd.DataFrame]:
+        """
+        Gather the subcategory tables concurrently, at most one worker per pooled driver.
+        """
+        max_workers = min(len(self.subcategories), pool.size)
+        tables = [None] * len(self.subcategories)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Submit tasks for each subcategory
+            futures = {executor.submit(self._gather_subcategory, category, pool): i for i, category in enumerate(self.subcategories)}
+
+            # Gather results as they become available, keeping the subcategories' declaration order
+            for future in as_completed(futures):
+                tables[futures[future]] = future.result()
+        return tables
+
+    def _gather_serial(self, pool: BrowserPool) -> list[pd.DataFrame]:
+        """
+        Gather the subcategory tables one after another.
+        """
+        return [self._gather_subcategory(category, pool) for category in self.subcategories]
+
+    def _gather_subcategory(self, category: str, pool: BrowserPool) -> pd.DataFrame:
+        """
+        Gather the odds table of a single subcategory using a driver from the pool.
+        """
+        subcategory = SubCategory(self.main_category, category, pool)
+        return subcategory.get_subcategory_odds()
+
     def __add__(self, other) -> pd.DataFrame:
         """
         Concatenate two MainCategory objects' dataframes.
@@ -89,59 +196,27 @@ class MainCategory:
         Returns:
         - pd.DataFrame: A DataFrame containing the concatenated data from both MainCategory objects.
         """
-        df = pd.concat([self.df, other.df])
-        df.reset_index(drop=True, inplace=True)
-        return df
+        df = pd.concat([self.df, other.df], ignore_index=True)
+        return df.astype({column: 'category' for column in _CATEGORICAL_COLUMNS if column in df})
 
 
 class SubCategory:
     """
     Represents a subcategory within a main category.
     """
-    def __init__(self, main_category: str, sub_category: str, driver_initializer):
+    def __init__(self, main_category: str, sub_category: str, pool: BrowserPool):
         self.main_category = main_category
         self.sub_category = sub_category
-        self.driver = driver_initializer()
+        self.pool = pool
         self.build_url()
+        self.tree = self.get_page_tree()
 
-        self._time_utc = None
-        self._time_local = None
-        self.soup = self.get_page_soup()
-
-
-    @property
-    def time_local(self) -> str:
-        """
-        Get the current local time.
-
-        Returns:
-        - str: The current local time in the format "%Y-%m-%d %H:%M:%S".
-        """
-        if self._time_local:
-            return self._time_local
-        self._time_local = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        return self._time_local
-
-    @property
-    def time_utc(self) -> str:
-        """
-        Get the current UTC time.
 
-        Returns:
-        - str: The current UTC time in the format "%Y-%m-%d %H:%M".
-        """
-        if self._time_utc:
-            return self._time_utc
-        self._time_utc = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M")
-        return self._time_utc
-    
     def build_url(self) -> None:
         """
         Build the URL for the subcategory based on the main category and subcategory names.
         """
-        sub_enc = urllib.parse.quote_plus(self.sub_category)
-        main_enc = urllib.parse.quote_plus(self.main_category)
-        self.url = f'https://sportsbook.draftkings.com/leagues/baseball/mlb?category={main_enc}&sub_category={sub_enc}'
+        self.url = _build_url(self.main_category, self.sub_category)
 
     def get_subcategory_odds(self) -> pd.DataFrame:
         """
@@ -150,112 +225,215 @@ class SubCategory:
         Returns:
         - pd.DataFrame: A DataFrame containing the gathered odds data.
         """
+        if self.tree is None:
+            print(f"No changes for the {self.sub_category} subcategory since the last gather")
+            _, df = _page_cache[self.url]
+            return df.assign(time_now_local=self.time_local, time_now_utc=self.time_utc)
+
         all_events = self.get_all_events()
         if len(all_events) == 0:
             print(f"No events found for the {self.sub_category} subcategory")
-            return pd.DataFrame()
+            df = pd.DataFrame()
+            _page_cache[self.url] = (self.page_hash, df)
+            return df
         
         print(f"Processing events for {self.sub_category}")
 
-        tables = []
+        players, over_under_totals, odds, odds_types = [], [], [], []
+        home_teams, away_teams, game_times_local, game_times_utc, game_dates = [], [], [], [], []
         for event in all_events:
-            table = self.get_match_table(event)
+            event_players, event_totals, event_odds, event_types = self.get_match_table(event)
             event_info = self.get_event_info(event)
-            table["home_team"] = event_info.home_team
-            table["away_team"] = event_info.away_team
-            table["game_time_local"] = event_info.game_time_local
-            table["game_time_utc"] = event_info.game_time_utc
-            table["game_date"] = event_info.game_date
-            tables.append(table)
-
-        df = pd.concat(tables)
+            n_rows = len(event_players)
+            players += event_players
+            over_under_totals += event_totals
+            odds += event_odds
+            odds_types += event_types
+            home_teams += [event_info.home_team] * n_rows
+            away_teams += [event_info.away_team] * n_rows
+            game_times_local += [event_info.game_time_local] * n_rows
+            game_times_utc += [event_info.game_time_utc] * n_rows
+            game_dates += [event_info.game_date] * n_rows
+
+        df = pd.DataFrame({
+                'player_name': players,
+                'over_under_total': pd.array(over_under_totals, dtype='float32'),
+                'odds': pd.array(odds, dtype=_odds_dtype(odds)), # Nullable, clean_odds returns None for unparsed cells
+                'odd_type': pd.Categorical(odds_types, categories=['Over', 'Under']),
+                'home_team': home_teams,
+                'away_team': away_teams,
+                'game_time_local': game_times_local,
+                'game_time_utc': game_times_utc,
+                'game_date': game_dates,
+            })
         df["main_category_type"] = self.main_category.replace("-", "_")
         df["sub_category_type"] = self.sub_category.replace("-", "_")
         df["time_now_local"] = self.time_local
         df["time_now_utc"] = self.time_utc
+        _page_cache[self.url] = (self.page_hash, df)
 
         print(f"Done processing events for {self.sub_category}")
         return df
 
-    def get_page_soup(self) -> BeautifulSoup:
+    def get_page_tree(self) -> Optional[lxml_html.HtmlElement]:
         """
-        Get the BeautifulSoup object for the web page.
+        Get the lxml element tree for the events on the web page.
 
         Returns:
-        - BeautifulSoup: The BeautifulSoup object representing the web page.
+        - Optional[lxml_html.HtmlElement]: A root element holding the page's events, or None if the page
+          is unchanged since the last gather and the cached odds can be reused.
         """
-        self.driver.get(self.url)
-        self.driver.implicitly_wait(10)
-        source = self.driver.page_source
-        # Saving time
-        self.time_local
-        self.time_utc
-        self.driver.close()
-        soup = BeautifulSoup(source, 'html.parser')
-        return soup
-
-    def get_match_table(self, match_soup: BeautifulSoup) -> pd.DataFrame:
+        driver = self.pool.acquire()
+        try:
+            driver.get(self.url)
+            try:
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.sportsbook-event-accordion__wrapper'))
+                )
+            except TimeoutException:
+                pass # No events listed for this subcategory
+            source = driver.execute_script(_EVENTS_HTML_SCRIPT)
+        finally:
+            self.pool.release(driver)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.time_utc = now.strftime("%Y-%m-%d %H:%M")
+        now_local = now.astimezone()
+        self.time_local = now_local.strftime("%Y-%m-%d %H:%M:%S")
+        self.date_local = now_local.date()
+        self.page_hash = hashlib.blake2b(source.encode(), digest_size=16).digest()
+        if _page_cache.get(self.url, (None,))[0] == self.page_hash:
+            return None
+        return lxml_html.fromstring(source)
+
+    def get_match_table(self, event: lxml_html.HtmlElement) -> tuple[list[str], list[float], list[int], list[str]]:
         """
-        Get the match table data from the BeautifulSoup object.
+        Get the match table data from the event element.
 
         Parameters:
-        - match_soup (BeautifulSoup): The BeautifulSoup object representing the match data.
+        - event (lxml_html.HtmlElement): The element representing the match data.
 
         Returns:
-        - pd.DataFrame: A DataFrame containing the match table data.
-        """
-        rows = match_soup.find('table').find_all('tr')[1:] # Exclude table header
-        players = []
-        over_under_totals = []
-        odds = []
-        odds_types = []
-        for row in rows:
-            player_name_uncleaned = row.find('th').get_text()
-            player_name = player_name_uncleaned.split("New")[0]
-            row_data = row.find_all('td')
-            over_uncleaned = unicodedata.normalize("NFKC", row_data[0].get_text())
-            under_uncleaned = unicodedata.normalize("NFKC", row_data[1].get_text())
+        - tuple[list[str], list[float], list[int], list[str]]: The player names, over/under totals, odds and odd types
+          of the match table, one entry per row.
+        """
+        rows = event.find('.//table').findall('.//tr')[1:] # Exclude table header
+        n_rows = len(rows)
+        players = [None] * (2 * n_rows)
+        over_under_totals = [None] * (2 * n_rows)
+        odds = [None] * (2 * n_rows)
+        odds_types = ['Over', 'Under'] * n_rows
+        for i, row in enumerate(rows):
+            player_name_uncleaned = row.find('.//th').text_content()
+            player_name = player_name_uncleaned.partition("New")[0]
+            row_data = row.findall('.//td')
+            over_uncleaned = row_data[0].text_content().translate(_NORM_TABLE)
+            under_uncleaned = row_data[1].text_content().translate(_NORM_TABLE)
             over_under_total1, over = clean_odds(over_uncleaned)
             over_under_total2, under = clean_odds(under_uncleaned)
-            
-            players += [player_name, player_name]
-            odds_types += ['Over', 'Under']
-            over_under_totals += [over_under_total1, over_under_total2]
-            odds += [over, under]
-        data = {
-                'player_name': players,
-                'over_under_total': over_under_totals,
-                'odds': odds,
-                "odd_type": odds_types,
-            }
-        return pd.DataFrame(data)
 
+            over_index, under_index = 2 * i, 2 * i + 1
+            players[over_index] = players[under_index] = player_name
+            over_under_totals[over_index] = over_under_total1
+            over_under_totals[under_index] = over_under_total2
+            odds[over_index] = over
+            odds[under_index] = under
+        return players, over_under_totals, odds, odds_types
 
-    def get_all_events(self) -> list[BeautifulSoup]:
+
+    def get_all_events(self) -> list[lxml_html.HtmlElement]:
         """
         Get all events/matches from the web page.
 
         Returns:
-        - list: A list of BeautifulSoup objects representing the events.
+        - list: A list of elements representing the events.
         """
-        events = self.soup.find_all('div', class_='sportsbook-event-accordion__wrapper')
+        events = self.tree.find_class('sportsbook-event-accordion__wrapper')
         return events
     
 
-    def get_event_info(self, event_soup: BeautifulSoup) -> EventInfo:
+    def get_event_info(self, event: lxml_html.HtmlElement) -> EventInfo:
         """
-        Get information about an event from the BeautifulSoup object.
+        Get information about an event from its element.
 
         Parameters:
-        - event_soup: The BeautifulSoup object representing the event.
+        - event: The element representing the event.
 
         Returns:
         - EventInfo: An EventInfo object containing information about the event.
         """
-        children = list(event_soup.find('div').children)[-3:-1]
-        away_team, home_team = split_teams(children[0].get_text())
-        game_time = children[1].get_text()
-        return EventInfo(home_team, away_team, game_time)
+        children = list(event.find('.//div'))[-3:-1]
+        away_team, home_team = split_teams(children[0].text_content())
+        game_time = children[1].text_content()
+        return _build_event_info(home_team, away_team, game_time, self.date_local)
+
+
+@functools.lru_cache(maxsize=64)
+def _build_url(main_category: str, sub_category: str) -> str:
+    """
+    Build the DraftKings URL for a subcategory. The subcategory names are fixed, so results are cached.
+
+    Parameters:
+    - main_category (str): The name of the main category.
+    - sub_category (str): The name of the subcategory.
+
+    Returns:
+    - str: The URL of the subcategory page.
+    """
+    sub_enc = urllib.parse.quote_plus(sub_category)
+    main_enc = urllib.parse.quote_plus(main_category)
+    return f'https://sportsbook.draftkings.com/leagues/baseball/mlb?category={main_enc}&sub_category={sub_enc}'
+
+
+@functools.lru_cache(maxsize=256)
+def _build_event_info(home_team: str, away_team: str, game_time: str, today: datetime.date) -> EventInfo:
+    """
+    Build the EventInfo for an event, splitting the game time into local and UTC times and setting the game date.
+    The same games appear in every subcategory, so results are cached.
+
+    Parameters:
+    - home_team (str): The name of the home team.
+    - away_team (str): The name of the away team.
+    - game_time (str): The game time as listed on the page, e.g. "Tomorrow 7:05PM".
+    - today (datetime.date): The local date the page was gathered on.
+
+    Returns:
+    - EventInfo: An EventInfo object containing information about the event.
+    """
+    day, time_str = game_time.split(' ')
+    if day == 'Tomorrow':
+        game_date = (today + datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+    else:
+        game_date = today.strftime('%Y-%m-%d')
+    full_time_str = f'{game_date} {time_str}'
+    time_obj = datetime.datetime.strptime(full_time_str, '%Y-%m-%d %I:%M%p')
+    game_time_local = time_obj.strftime("%H:%M")
+    game_time_utc = time_obj.astimezone(datetime.timezone.utc).strftime("%H:%M")
+    return EventInfo(home_team, away_team, game_time, game_date, game_time_local, game_time_utc)
+
+
+def _quit_driver(driver) -> None:
+    """
+    Quit a driver, ignoring errors from a browser or chromedriver that is already gone.
+    """
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def _odds_dtype(odds: list[int]) -> str:
+    """
+    Pick the smallest nullable integer dtype that holds every odds value.
+
+    Example:
+    >>> _odds_dtype([800, -2000, None])
+    'Int16'
+    >>> _odds_dtype([40000])
+    'Int32'
+    """
+    if all(odd is None or -32768 <= odd <= 32767 for odd in odds):
+        return 'Int16'
+    return 'Int32'
 
 
 def clean_odds(text: str) -> tuple[float, int]:
@@ -263,7 +441,7 @@ def clean_odds(text: str) -> tuple[float, int]:
     Clean the odds text and extract the over/under value and odds.
 
     Parameters:
-    - text (str): The odds text to clean and extract information from.
+    - text (str): The odds text to clean and extract information from, with minus signs already normalized to '-'.
 
     Returns:
     - tuple[float, int]: A tuple containing the over/under value and the odds.
@@ -271,17 +449,15 @@ def clean_odds(text: str) -> tuple[float, int]:
     Example:
     >>> clean_odds('O 0.5+800')
     (0.5, 800)
-    >>> clean_odds('U 0.5−2000')
+    >>> clean_odds('U 0.5-2000')
     (0.5, -2000)
     """
-    pattern = r'^([OU])\s(\d+\.\d+)([+\−]\d+)$'
-
-    match = re.match(pattern, text)
+    match = _ODDS_RE.match(text)
 
     if match:
         _ = match.group(1) # bet type
         over_under = float(match.group(2))
-        odds = int(match.group(3).replace('−', '-'))
+        odds = int(match.group(3))
 
         return over_under, odds
     else:
@@ -302,10 +478,9 @@ def split_teams(text: str) -> tuple[str, str]:
     >>> split_teams("WAS NationalsatSF Giants")
     ('WAS Nationals', 'SF Giants')
     """
-    match = re.search(r'[a-z][A-Z]', text)
+    match = _TEAM_RE.search(text)
     if match:
-        team1 = text[:match.start()+1]
-        team2 = text[match.start()+1:]
-        return team1.strip()[:-2], team2.strip()
+        split = match.start() + 1
+        return text[:split - 2].lstrip(), text[split:].strip() # Drop the "at" joining the teams
     else:
         return None, None